@@ -1,9 +1,13 @@
 import fitz
-from os.path import join, abspath, dirname, isdir, isfile
-from os import listdir
+from os.path import join, isfile, relpath, basename, realpath, splitext
+from os import scandir
+from fnmatch import fnmatch
+from itertools import repeat
 import json
+import hashlib
 from datetime import datetime
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 subject_translation = {  # since the annotation data in the PDF is dependent on the language settings of the PDF reader
     # that was used to add the annotations
@@ -200,39 +204,49 @@ def process_notes(pdf: fitz.Document):
     return notes
 
 
+def pdf_read(pdf_path: str):
+    with fitz.open(pdf_path) as pdf:
+        return pdf.metadata, process_notes(pdf)
+
+
+def merge_paper_info(
+    metadata: dict,
+    notes: dict,
+    paper_overwrite: dict[str, str],
+    paper_misses: dict[str, str],
+):
+    data = {}
+    data, missing = _merge_extracted_and_additional(
+        data,
+        metadata,
+        paper_overwrite,
+        paper_misses,
+        ("author", metadata["author"]),
+    )
+    data, missing = _merge_extracted_and_additional(
+        data,
+        metadata,
+        paper_overwrite,
+        paper_misses,
+        ("date", metadata["creationDate"]),
+        extract_year_month,
+    )
+    data, missing = _merge_extracted_and_additional(
+        data,
+        metadata,
+        paper_overwrite,
+        paper_misses,
+        ("doi", metadata["subject"]),
+        extract_doi,
+    )
+    return {**data, "notes": notes}, missing
+
+
 def pdf_extract_info(
     pdf_path: str, paper_overwrite: dict[str, str], paper_misses: dict[str, str]
 ):
-    with fitz.open(pdf_path) as pdf:
-        data = {}
-        notes = {}
-
-        metadata = pdf.metadata
-        data, missing = _merge_extracted_and_additional(
-            data,
-            metadata,
-            paper_overwrite,
-            paper_misses,
-            ("author", metadata["author"]),
-        )
-        data, missing = _merge_extracted_and_additional(
-            data,
-            metadata,
-            paper_overwrite,
-            paper_misses,
-            ("date", metadata["creationDate"]),
-            extract_year_month,
-        )
-        data, missing = _merge_extracted_and_additional(
-            data,
-            metadata,
-            paper_overwrite,
-            paper_misses,
-            ("doi", metadata["subject"]),
-            extract_doi,
-        )
-        notes = process_notes(pdf)
-    return {**data, "notes": notes}, missing
+    metadata, notes = pdf_read(pdf_path)
+    return merge_paper_info(metadata, notes, paper_overwrite, paper_misses)
 
 
 def add_pdf_info_to_collection(
@@ -260,7 +274,7 @@ def add_pdf_info_to_collection(
     return collection, paper_misses
 
 
-def _sort_out_empty(collected_notes: dict) -> tuple[dict, dict]:
+def sort_out_empty(collected_notes: dict) -> tuple[dict, dict]:
     def iter_notes(notes_loop: dict, notes_pop: dict, empty: dict):
         for directory, subdir in notes_loop.items():
             if not list(subdir)[0].startswith("f_"):
@@ -285,31 +299,80 @@ def _sort_out_empty(collected_notes: dict) -> tuple[dict, dict]:
     return iter_notes(collected_notes, deepcopy(collected_notes), {})
 
 
-def collect_notes(
-    root: str = "",
-    dirname_literature: str = "literature",
-    file_overwrite: str = None,
-    file_json: str = None,
-    file_missing: str = "missing.json",
-    file_empty: str = "empty.json",
+def iter_pdfs(
+    directory: str,
+    include: tuple[str, ...] = ("*.pdf",),
+    exclude: tuple[str, ...] = (),
 ):
-    """Collects all notes from the PDFs present in an arbitrary directory structure that lies in the 'root'
-    directory.
+    """Yields the paths of all files below 'directory' whose names match one of the 'include' glob patterns.
+    Files and directories whose names match one of the 'exclude' glob patterns are skipped. Symlinked
+    directories are followed unless they point into 'directory' (which is walked anyway) or to a directory
+    above them (which would be a loop).
+    """
+    for entry in _iter_pdf_entries(directory, include, exclude):
+        yield entry.path
 
-    :param root: Root/parent directory of the literature, defaults to None which presupposes that this file
-    (transfer.py) is inside the first level of the literature root directory.
-    :type root: str, optional
-    :param file_json: Whether or not the collected notes are saved as a .json, defaults to False
-    :type file_json: bool, optional
-    :param ff_output: The name of the .json file with the collect notes, defaults to "collected_notes.json"
-    :type ff_output: str, optional
-    :param additional_information: _description_, defaults to None
-    :type additional_information: str, optional
-    :return: _description_
-    :rtype: _type_
+
+def _iter_pdf_entries(
+    directory: str, include: tuple[str, ...], exclude: tuple[str, ...]
+):
+
+    def matches(name: str, patterns: tuple[str, ...]):
+        return any(fnmatch(name, pattern) for pattern in patterns)
+
+    def in_root(real_path: str):
+        return real_path == real_root or real_path.startswith(join(real_root, ""))
+
+    def walk(current_dir: str, real_dir: str, ancestors: frozenset[str]):
+        with scandir(current_dir) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        for entry in entries:
+            if matches(entry.name, exclude):
+                continue
+            if entry.is_dir():
+                # only symlinks need to be resolved, for all other directories the real path follows from
+                # the real path of the parent directory
+                if entry.is_symlink():
+                    real_child = realpath(entry.path)
+                    if in_root(real_child) or real_child in ancestors:
+                        continue
+                else:
+                    real_child = join(real_dir, entry.name)
+                yield from walk(entry.path, real_child, ancestors | {real_child})
+            elif entry.is_file() and matches(entry.name, include):
+                yield entry
+
+    real_root = realpath(directory)
+    yield from walk(directory, real_root, frozenset((real_root,)))
+
+
+def save_collection(
+    collected_info: dict,
+    missing_per_file: dict[str, dict],
+    file_empty: str | None,
+    file_json: str | None,
+) -> dict:
+    """Writes the missing metadata (to every file in 'missing_per_file'), the papers without notes (if
+    'file_empty' is set) and the collection (if 'file_json' is set). Returns the collection, from which the
+    papers without notes are removed if 'file_empty' is set.
     """
-    dir_lit = join(root, dirname_literature)
+    for ff_missing, missing in missing_per_file.items():
+        with open(ff_missing, "w") as f_missing:
+            json.dump(missing, f_missing, indent=4)
 
+    if file_empty:
+        collected_info, empty = sort_out_empty(collected_info)
+        with open(file_empty, "w") as f_empty:
+            json.dump(empty, f_empty, indent=4)
+
+    if file_json:
+        with open(file_json, "w") as f_notes:
+            json.dump(collected_info, f_notes, indent=4)
+
+    return collected_info
+
+
+def load_additional(root: str, file_overwrite: str | None, file_missing: str):
     ff_missing = join(root, file_missing)
     if not isfile(ff_missing):
         missing = {}
@@ -332,54 +395,198 @@ def collect_notes(
                         f"The field '{overwrite_field}' for paper {paper_overwrite_field} is tried to "
                         "be set from 'missing.json' and 'overwrite.json'. It must only be set by one."
                     )
+    return overwrite, missing
 
-    def iter_dirs(root_directory: str, current_path: str, collected_info: dict):
-        for child_dir in listdir(root_directory):
-            directory = join(current_path, child_dir)
-            if not isdir(directory) and isfile(directory):
-                if child_dir[-4:] != ".pdf":
-                    if child_dir == ".DS_Store":  # some macOS stuff
-                        continue
-                    raise RuntimeError(
-                        f"Found file '{child_dir}' in directory '{root_directory}'. There must only be "
-                        ".pdf files here."
-                    )
-                filename = child_dir[:-4]
-                paper_overwrite = overwrite[filename] if filename in overwrite else {}
-                paper_misses = missing[filename] if filename in missing else {}
-                collected_info, paper_misses = add_pdf_info_to_collection(
-                    collected_info, directory, paper_overwrite, paper_misses
-                )
-                missing[filename] = paper_misses
-                if paper_misses == {}:
-                    missing.pop(filename)
-                continue
-            current_path = directory
-            current_path, collected_info = iter_dirs(
-                directory, current_path, collected_info
-            )
-        idx_root_until = current_path.replace("\\", "/").rfind("/")
-        idx_root_until = idx_root_until if idx_root_until != -1 else 0
-        return current_path[:idx_root_until], collected_info
 
-    collected_info = {}
-    current_path = dir_lit
-    _, collected_info = iter_dirs(dir_lit, current_path, collected_info)
+def collect_notes(
+    root: str = "",
+    dirname_literature: str = "literature",
+    file_overwrite: str = None,
+    file_json: str = None,
+    file_missing: str = "missing.json",
+    file_empty: str = "empty.json",
+    include: tuple[str, ...] = ("*.pdf",),
+    exclude: tuple[str, ...] = (),
+):
+    """Collects all notes from the PDFs present in an arbitrary directory structure that lies in the 'root'
+    directory. Files that do not match 'include' or that match 'exclude' are skipped.
 
-    if file_missing:
-        with open(ff_missing, "w") as f_missing:
-            json.dump(missing, f_missing, indent=4)
+    :param root: Root/parent directory of the literature, defaults to None which presupposes that this file
+    (transfer.py) is inside the first level of the literature root directory.
+    :type root: str, optional
+    :param file_json: Whether or not the collected notes are saved as a .json, defaults to False
+    :type file_json: bool, optional
+    :param ff_output: The name of the .json file with the collect notes, defaults to "collected_notes.json"
+    :type ff_output: str, optional
+    :param additional_information: _description_, defaults to None
+    :type additional_information: str, optional
+    :param include: Glob patterns of the file names that are collected, defaults to ("*.pdf",)
+    :type include: tuple[str, ...], optional
+    :param exclude: Glob patterns of file and directory names that are skipped, defaults to ()
+    :type exclude: tuple[str, ...], optional
+    :return: _description_
+    :rtype: _type_
+    """
+    dir_lit = join(root, dirname_literature)
+    ff_missing = join(root, file_missing)
+    overwrite, missing = load_additional(root, file_overwrite, file_missing)
+
+    collected_info = {}
+    for ff_paper in iter_pdfs(dir_lit, include, exclude):
+        filename = splitext(basename(ff_paper))[0]
+        paper_overwrite = overwrite[filename] if filename in overwrite else {}
+        paper_misses = missing[filename] if filename in missing else {}
+        collected_info, paper_misses = add_pdf_info_to_collection(
+            collected_info, ff_paper, paper_overwrite, paper_misses
+        )
+        missing[filename] = paper_misses
+        if paper_misses == {}:
+            missing.pop(filename)
 
     for directory in join(root, dir_lit).replace("\\", "/").split("/"):
         collected_info = collected_info[directory]
 
-    if file_empty:
-        collected_info, empty = _sort_out_empty(collected_info)
-        with open(file_empty, "w") as f_empty:
-            json.dump(empty, f_empty, indent=4)
+    return save_collection(
+        collected_info,
+        {ff_missing: missing} if file_missing else {},
+        file_empty,
+        file_json,
+    )
 
-    if file_json:
-        with open(file_json, "w") as f_notes:
-            json.dump(collected_info, f_notes, indent=4)
 
-    return collected_info
+def _file_hash(ff_file: str, chunk_size: int = 2**20) -> str:
+    file_hash = hashlib.sha256()
+    with open(ff_file, "rb") as f:
+        while chunk := f.read(chunk_size):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def _scan_root(
+    dir_lit: str, include: tuple[str, ...], exclude: tuple[str, ...]
+) -> list[tuple[str, int]]:
+    return [
+        (entry.path, entry.stat().st_size)
+        for entry in _iter_pdf_entries(dir_lit, include, exclude)
+    ]
+
+
+def collection_node(collection: dict, directories: list[str]) -> dict:
+    node = collection
+    for directory in directories:
+        node = node.setdefault(directory.replace("_", " "), {})
+    return node
+
+
+def collect_notes_from_roots(
+    roots: list[str],
+    dirname_literature: str = "literature",
+    file_overwrite: str = None,
+    file_json: str = None,
+    file_missing: str = "missing.json",
+    file_empty: str = "empty.json",
+    max_workers: int = None,
+    include: tuple[str, ...] = ("*.pdf",),
+    exclude: tuple[str, ...] = (),
+):
+    """Collects all notes from the PDFs of several literature directories and merges them into one
+    collection. The roots are scanned concurrently and a PDF that is present in more than one root (same
+    file content) is only extracted once. Only PDFs whose file size occurs in more than one root are hashed
+    to find these. It is added to the collection at the position it has in the first
+    root it was found in. Identical copies within the same root are all added to the collection. Two
+    different PDFs with the same relative path in different roots raise a ValueError.
+
+    :param roots: Root/parent directories of the literature. Each root has its own 'missing.json' and
+    overwrite file.
+    :type roots: list[str]
+    :param dirname_literature: Name of the literature directory inside every root, defaults to "literature"
+    :type dirname_literature: str, optional
+    :param file_overwrite: Name of the overwrite file inside every root, defaults to None
+    :type file_overwrite: str, optional
+    :param file_json: File to which the merged collection is saved, defaults to None (not saved)
+    :type file_json: str, optional
+    :param file_missing: Name of the file with missing metadata inside every root, defaults to "missing.json"
+    :type file_missing: str, optional
+    :param file_empty: File to which the papers without notes are saved, defaults to "empty.json"
+    :type file_empty: str, optional
+    :param max_workers: Maximum number of workers used for scanning and extraction, defaults to None
+    :type max_workers: int, optional
+    :param include: Glob patterns of the file names that are collected, defaults to ("*.pdf",)
+    :type include: tuple[str, ...], optional
+    :param exclude: Glob patterns of file and directory names that are skipped, defaults to ()
+    :type exclude: tuple[str, ...], optional
+    :return: The merged collection.
+    :rtype: dict
+    """
+    additional = [load_additional(root, file_overwrite, file_missing) for root in roots]
+    dirs_lit = [join(root, dirname_literature) for root in roots]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        scanned = list(
+            executor.map(_scan_root, dirs_lit, repeat(include), repeat(exclude))
+        )
+
+        # only files whose size occurs in more than one root can be present in several roots, hence only
+        # they are hashed. All other files are identified by their path.
+        roots_per_size = {}
+        for idx_root, root_pdfs in enumerate(scanned):
+            for _, size in root_pdfs:
+                roots_per_size.setdefault(size, set()).add(idx_root)
+        to_hash = [
+            ff_paper
+            for root_pdfs in scanned
+            for ff_paper, size in root_pdfs
+            if len(roots_per_size[size]) > 1
+        ]
+        hashes = dict(zip(to_hash, executor.map(_file_hash, to_hash)))
+    scanned = [
+        [(ff_paper, hashes.get(ff_paper, ff_paper)) for ff_paper, _ in root_pdfs]
+        for root_pdfs in scanned
+    ]
+
+    to_extract = {}
+    for root_pdfs in scanned:
+        for ff_paper, paper_id in root_pdfs:
+            to_extract.setdefault(paper_id, ff_paper)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        extracted = dict(
+            zip(to_extract, executor.map(pdf_read, to_extract.values()))
+        )
+
+    collected_info = {}
+    added = {}  # paper id -> index of the root it was added from
+    for idx_root, (dir_lit, root_pdfs, (overwrite, missing)) in enumerate(
+        zip(dirs_lit, scanned, additional)
+    ):
+        for ff_paper, paper_id in root_pdfs:
+            filename = splitext(basename(ff_paper))[0]
+            paper_overwrite = overwrite[filename] if filename in overwrite else {}
+            paper_misses = missing[filename] if filename in missing else {}
+            paper_info, paper_misses = merge_paper_info(
+                deepcopy(extracted[paper_id][0]),
+                extracted[paper_id][1],
+                paper_overwrite,
+                paper_misses,
+            )
+            missing[filename] = paper_misses
+            if paper_misses == {}:
+                missing.pop(filename)
+
+            if added.get(paper_id, idx_root) != idx_root:
+                continue
+            added[paper_id] = idx_root
+            directories = relpath(ff_paper, dir_lit).replace("\\", "/").split("/")
+            node = collection_node(collected_info, directories[:-1])
+            paper_key = "f_" + directories[-1].replace("_", " ")
+            if paper_key in node:
+                raise ValueError(
+                    f"The paper '{ff_paper}' would replace a different paper in the collection (e.g. one with "
+                    "the same path in another root). Papers with the same path must have the same content."
+                )
+            node[paper_key] = paper_info
+
+    missing_per_file = {
+        join(root, file_missing): missing for root, (_, missing) in zip(roots, additional)
+    }
+    return save_collection(
+        collected_info, missing_per_file if file_missing else {}, file_empty, file_json
+    )
@@ -1,6 +1,10 @@
 # general imports
 import json
+import re
 from datetime import date
+from os import makedirs
+from os.path import join
+from concurrent.futures import ProcessPoolExecutor
 import pylatex as tex  # general fits-all import
 
 # pylatex imports for convenience
@@ -294,46 +298,193 @@ def paper_notes_to_tex_paragraph(tex_document: tex.document, paper_data: dict):
         create_latex_table(tex_document, category, subcat_dict)
 
 
-def collected_notes_to_tex(
-    collected_notes: dict = None, ff_json: str = None, save_as: str = "collected"
+_idx_to_section = {0: Section, 1: Subsection, 2: Subsubsection, 3: Paragraph}
+_idx_paper = 3
+
+
+def loop_notes(
+    tex_document: tex.Document, dir_data: dict, level_idx: int, title_prefix: str = ""
 ):
+    # the papers of a directory come before its subdirectories so that they are not rendered under the heading
+    # of a subdirectory
+    children = sorted(dir_data, key=lambda child: not child.startswith("f_"))
+    for child in children:
+        child_data = dir_data[child]
+        if child.startswith("f_"):
+            if isinstance(child_data, str):  # paper that has already been rendered
+                tex_document.append(tex.NoEscape(child_data))
+            elif child_data != {}:
+                with tex_document.create(_idx_to_section[_idx_paper](child[2:-4])):
+                    paper_notes_to_tex_paragraph(tex_document, child_data)
+                    tex_document.append(Command("clearpage"))
+            continue
+
+        title = title_prefix + child
+        has_papers = any(grandchild.startswith("f_") for grandchild in child_data)
+        if level_idx < _idx_paper - 1:
+            with tex_document.create(_idx_to_section[level_idx](title)):
+                loop_notes(tex_document, child_data, level_idx + 1)
+        elif not has_papers:
+            # there are no more sectioning levels left for directories, hence the deeper directories are
+            # merged into the title of the last directory level
+            loop_notes(tex_document, child_data, level_idx + 1, title + " / ")
+        else:
+            with tex_document.create(_idx_to_section[_idx_paper - 1](title)):
+                loop_notes(tex_document, child_data, level_idx + 1, title + " / ")
+
+
+def paper_to_tex(paper: str, paper_data: dict) -> str:
+    paragraph = _idx_to_section[_idx_paper](paper[2:-4])
+    paper_notes_to_tex_paragraph(paragraph, paper_data)
+    paragraph.append(Command("clearpage"))
+    return paragraph.dumps()
+
+
+def new_document(title: str = None):
+    doc = Document(documentclass="article", document_options="a4paper")
+    for apply in [use_packages, redefine, newcommands]:
+        doc = apply(doc)
+
+    if title is not None:
+        doc.preamble.append(Command("title", title))
+        doc.preamble.append(Command("date", ""))
+        doc.append(Command("maketitle"))
+    return doc
+
+
+def _load_collected(collected_notes: dict | None, ff_json: str | None):
     if (collected_notes is None and ff_json is None) or (
         collected_notes is not None and ff_json is not None
     ):
         raise ValueError(
-            "Either 'collected_notes' or 'ff_json' must be set using 'collected_json_to_tex()', not both "
-            "or neither."
+            "Either 'collected_notes' or 'ff_json' must be set, not both or neither."
         )
-    idx_to_section = {0: Section, 1: Subsection, 2: Subsubsection, 3: Paragraph}
-
-    def loop_notes(tex_document: tex.Document, dir_data: dict, level_idx: int):
-        for child, child_data in dir_data.items():
-            if not child.startswith("f_"):
-                with tex_document.create(idx_to_section[level_idx](child)):
-                    level_idx += 1
-                    if level_idx > 2:
-                        raise NotImplementedError(
-                            "Currently, only 3-level nested directories are supported but "
-                            f"directory '{child}' is on the fourth."
-                        )
-                    level_idx = loop_notes(tex_document, child_data, level_idx)
-            else:
-                if child_data != {}:
-                    with tex_document.create(idx_to_section[3](child[2:-4])):
-                        paper_notes_to_tex_paragraph(tex_document, child_data)
-                        tex_document.append(Command("clearpage"))
-        return level_idx - 1
-
-    doc = Document(documentclass="article", document_options="a4paper")
-    for apply in [use_packages, redefine, newcommands]:
-        doc = apply(doc)
-
-    doc.append(texstr("\contents"))
 
     if ff_json is not None:
         with open(ff_json, "r") as file_notes:
             collected_notes = json.load(file_notes)
+    return collected_notes
+
 
-    level_idx = 0
-    loop_notes(doc, collected_notes, level_idx)
+def collected_notes_to_tex(
+    collected_notes: dict = None, ff_json: str = None, save_as: str = "collected"
+):
+    collected_notes = _load_collected(collected_notes, ff_json)
+
+    doc = new_document()
+    doc.append(texstr("\\contents"))
+    loop_notes(doc, collected_notes, 0)
     doc.generate_tex(save_as)
+
+
+def _has_papers(dir_data: dict):
+    return any(
+        child_data != {} if child.startswith("f_") else _has_papers(child_data)
+        for child, child_data in dir_data.items()
+    )
+
+
+def _find_shards(dir_data: dict, shard_depth: int, path: tuple[str, ...] = ()):
+    # papers of a directory that is split further get a shard of their own
+    papers = {
+        child: data
+        for child, data in dir_data.items()
+        if child.startswith("f_") and data != {}
+    }
+    shards = [(path, papers)] if papers != {} else []
+    for child, child_data in dir_data.items():
+        if child.startswith("f_") or not _has_papers(child_data):
+            continue
+        child_path = path + (child,)
+        has_subdirs = any(not grandchild.startswith("f_") for grandchild in child_data)
+        if len(child_path) == shard_depth or not has_subdirs:
+            shards.append((child_path, child_data))
+        else:
+            shards += _find_shards(child_data, shard_depth, child_path)
+    return shards
+
+
+def _shard_filenames(shard_paths: list[tuple[str, ...]], taken: set[str]):
+    filenames = []
+    for shard_path in shard_paths:
+        # "." cannot be part of a sanitised directory name, hence different paths give different names
+        filename = ".".join(re.sub(r"[^\w-]+", "_", part) for part in shard_path)
+        filename = filename if filename != "" else "literature"
+        unique, i = filename, 1
+        while unique in taken:  # different directory names can still be sanitised to the same name
+            i += 1
+            unique = f"{filename}_{i}"
+        taken.add(unique)
+        filenames.append(unique)
+    return filenames
+
+
+def _shard_to_tex(title: str, shard_data: dict, save_as: str):
+    doc = new_document(title)
+    doc.append(texstr("\\contents"))
+    loop_notes(doc, shard_data, 0)
+    doc.generate_tex(save_as)
+    return save_as
+
+
+def collected_notes_to_sharded_tex(
+    collected_notes: dict = None,
+    ff_json: str = None,
+    shard_depth: int = 1,
+    save_dir: str = "shards",
+    save_as_index: str = "index",
+    max_workers: int = None,
+):
+    """Writes one standalone .tex document per directory subtree at depth 'shard_depth' of the collection
+    and an index document that links the (compiled) shards. Papers that lie in a directory above
+    'shard_depth' get a shard for that directory. The shards are generated in parallel.
+
+    :param collected_notes: The collected notes, defaults to None
+    :type collected_notes: dict, optional
+    :param ff_json: .json file with the collected notes, defaults to None
+    :type ff_json: str, optional
+    :param shard_depth: Directory depth at which the collection is split into shards, defaults to 1
+    :type shard_depth: int, optional
+    :param save_dir: Directory to which the shards and the index are saved, defaults to "shards". Shards
+    from earlier runs that are not part of the current run are not removed from it (the index only links the
+    current ones).
+    :type save_dir: str, optional
+    :param save_as_index: Name of the index document, defaults to "index"
+    :type save_as_index: str, optional
+    :param max_workers: Maximum number of worker processes, defaults to None
+    :type max_workers: int, optional
+    """
+    if shard_depth < 1:
+        raise ValueError(f"'shard_depth' must be at least 1 but is {shard_depth}.")
+    collected_notes = _load_collected(collected_notes, ff_json)
+    makedirs(save_dir, exist_ok=True)
+
+    shards = _find_shards(collected_notes, shard_depth)
+    titles = [" / ".join(shard_path) or "Literature" for shard_path, _ in shards]
+    filenames = _shard_filenames(
+        [shard_path for shard_path, _ in shards], {save_as_index}
+    )
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        list(
+            executor.map(
+                _shard_to_tex,
+                titles,
+                [shard_data for _, shard_data in shards],
+                [join(save_dir, filename) for filename in filenames],
+            )
+        )
+
+    index = new_document("Collected notes")
+    if shards == []:  # an empty itemize does not compile
+        index.append("No notes were collected.")
+    else:
+        with index.create(tex.Itemize()) as itemize:
+            for title, filename in zip(titles, filenames):
+                itemize.add_item(
+                    Command(
+                        "href",
+                        arguments=tex.NoEscape(f"{filename}.pdf"),
+                        extra_arguments=title,
+                    )
+                )
+    index.generate_tex(join(save_dir, save_as_index))
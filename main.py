@@ -1,7 +1,25 @@
-from collect_from_pdfs import collect_notes
-from collected_to_tex import collected_notes_to_tex
+from collect_from_pdfs import collect_notes, collect_notes_from_roots
+from collected_to_tex import collected_notes_to_tex, collected_notes_to_sharded_tex
+from pdfs_to_tex import pdfs_to_tex_pipelined
 
 if __name__ == "__main__":
     file_collected_notes = "collected_notes.json"
-    collected_notes = collect_notes(file_json=file_collected_notes)
-    collected_notes_to_tex(collected_notes)
+    roots = [""]  # parent directories of the "literature" directories
+    shard_depth = None  # directory depth at which the .tex is split into standalone documents
+    pipelined = False  # render the .tex while the PDFs are still being extracted
+    if pipelined and (len(roots) != 1 or shard_depth is not None):
+        raise ValueError(
+            "The pipelined mode only supports a single root and no sharding ('shard_depth' must be None)."
+        )
+
+    if pipelined:
+        pdfs_to_tex_pipelined(root=roots[0], file_json=file_collected_notes)
+    else:
+        if len(roots) == 1:
+            collected_notes = collect_notes(root=roots[0], file_json=file_collected_notes)
+        else:
+            collected_notes = collect_notes_from_roots(roots, file_json=file_collected_notes)
+        if shard_depth is None:
+            collected_notes_to_tex(collected_notes)
+        else:
+            collected_notes_to_sharded_tex(collected_notes, shard_depth=shard_depth)
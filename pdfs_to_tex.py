@@ -0,0 +1,138 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from os.path import join, relpath, basename, splitext
+from queue import Queue
+from threading import Thread
+
+from collect_from_pdfs import (
+    iter_pdfs,
+    pdf_read,
+    load_additional,
+    merge_paper_info,
+    collection_node,
+    save_collection,
+)
+from collected_to_tex import loop_notes, paper_to_tex, new_document, texstr
+
+
+def _render_papers(papers: Queue, rendered: dict, skip_empty: bool, errors: list):
+    while (paper := papers.get()) is not None:
+        if errors:
+            continue  # keep draining the queue so that the extraction does not block
+        directories, paper_key, paper_info = paper
+        if skip_empty and paper_info["notes"] == {}:
+            continue
+        try:
+            node = collection_node(rendered, directories)
+            node[paper_key] = paper_to_tex(paper_key, paper_info)
+        except Exception as error:
+            errors.append(error)
+
+
+def pdfs_to_tex_pipelined(
+    root: str = "",
+    dirname_literature: str = "literature",
+    file_overwrite: str = None,
+    file_json: str = None,
+    file_missing: str = "missing.json",
+    file_empty: str = "empty.json",
+    save_as: str = "collected",
+    include: tuple[str, ...] = ("*.pdf",),
+    exclude: tuple[str, ...] = (),
+    max_workers: int = None,
+    queue_size: int = 16,
+):
+    """Collects the notes from the PDFs (see 'collect_notes()') and creates the .tex (see
+    'collected_notes_to_tex()') in one pipeline: while the PDFs are still being extracted by worker processes,
+    every extracted paper is passed through a bounded queue to a thread that renders its LaTeX. The order of
+    the papers and directories in the .tex is the same as in 'collected_notes_to_tex()'.
+
+    :param root: Root/parent directory of the literature, defaults to ""
+    :type root: str, optional
+    :param dirname_literature: Name of the literature directory inside 'root', defaults to "literature"
+    :type dirname_literature: str, optional
+    :param file_overwrite: Name of the overwrite file inside 'root', defaults to None
+    :type file_overwrite: str, optional
+    :param file_json: File to which the collected notes are saved, defaults to None (not saved)
+    :type file_json: str, optional
+    :param file_missing: Name of the file with missing metadata inside 'root', defaults to "missing.json"
+    :type file_missing: str, optional
+    :param file_empty: File to which the papers without notes are saved, defaults to "empty.json"
+    :type file_empty: str, optional
+    :param save_as: Name of the created .tex, defaults to "collected"
+    :type save_as: str, optional
+    :param include: Glob patterns of the file names that are collected, defaults to ("*.pdf",)
+    :type include: tuple[str, ...], optional
+    :param exclude: Glob patterns of file and directory names that are skipped, defaults to ()
+    :type exclude: tuple[str, ...], optional
+    :param max_workers: Maximum number of extraction processes, defaults to None
+    :type max_workers: int, optional
+    :param queue_size: Maximum number of extracted papers waiting to be rendered, defaults to 16
+    :type queue_size: int, optional
+    :return: The collected notes.
+    :rtype: dict
+    """
+    dir_lit = join(root, dirname_literature)
+    overwrite, missing = load_additional(root, file_overwrite, file_missing)
+
+    papers = Queue(maxsize=queue_size)
+    rendered = {}
+    errors = []
+    renderer = Thread(
+        target=_render_papers, args=(papers, rendered, bool(file_empty), errors)
+    )
+    renderer.start()
+
+    collected_info = {}
+
+    def pass_on(ff_paper: str, extracted):
+        filename = splitext(basename(ff_paper))[0]
+        paper_overwrite = overwrite[filename] if filename in overwrite else {}
+        paper_misses = missing[filename] if filename in missing else {}
+        metadata, notes = extracted.result()
+        paper_info, paper_misses = merge_paper_info(
+            metadata, notes, paper_overwrite, paper_misses
+        )
+        missing[filename] = paper_misses
+        if paper_misses == {}:
+            missing.pop(filename)
+
+        directories = relpath(ff_paper, dir_lit).replace("\\", "/").split("/")
+        directories = [directory.replace("_", " ") for directory in directories]
+        paper_key = "f_" + directories[-1]
+        collection_node(collected_info, directories[:-1])[paper_key] = paper_info
+        papers.put((directories[:-1], paper_key, paper_info))
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # the papers are passed on in the order in which they were found; limiting the number of pending
+            # extractions keeps the walk from running arbitrarily far ahead of the rendering
+            pending = deque()
+            for ff_paper in iter_pdfs(dir_lit, include, exclude):
+                pending.append((ff_paper, executor.submit(pdf_read, ff_paper)))
+                if len(pending) > queue_size:
+                    pass_on(*pending.popleft())
+                if errors:
+                    break
+            while pending and not errors:
+                pass_on(*pending.popleft())
+            for _, extracted in pending:
+                extracted.cancel()
+    finally:
+        papers.put(None)
+        renderer.join()
+    if errors:
+        raise errors[0]
+
+    collected_info = save_collection(
+        collected_info,
+        {join(root, file_missing): missing} if file_missing else {},
+        file_empty,
+        file_json,
+    )
+
+    doc = new_document()
+    doc.append(texstr("\\contents"))
+    loop_notes(doc, rendered, 0)
+    doc.generate_tex(save_as)
+    return collected_info
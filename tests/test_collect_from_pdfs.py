@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import makedirs, symlink
+from os.path import join
+
+import pytest
+
+pytest.importorskip("fitz")
+import collect_from_pdfs
+
+
+def _read_stub(pdf_path: str):
+    with open(pdf_path, "r") as f:
+        note = f.read()
+    metadata = {"author": "author", "creationDate": "D:20200101000000", "subject": ""}
+    return metadata, {"general": [("1", note)]}
+
+
+@pytest.fixture
+def stub_extraction(monkeypatch):
+    monkeypatch.setattr(collect_from_pdfs, "pdf_read", _read_stub)
+    monkeypatch.setattr(collect_from_pdfs, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+
+def _add_pdf(root, relative_path: str, content: str):
+    ff_pdf = join(root, "literature", relative_path)
+    makedirs(ff_pdf.rsplit("/", 1)[0], exist_ok=True)
+    with open(ff_pdf, "w") as f:
+        f.write(content)
+
+
+def test_same_path_different_content_raises(tmp_path, stub_extraction):
+    roots = [str(tmp_path / "r1"), str(tmp_path / "r2")]
+    _add_pdf(roots[0], "A/B/x.pdf", "one")
+    _add_pdf(roots[1], "A/B/x.pdf", "two")
+
+    with pytest.raises(ValueError):
+        collect_from_pdfs.collect_notes_from_roots(roots, file_empty=None)
+
+
+def test_same_content_is_added_once_across_roots(tmp_path, stub_extraction):
+    roots = [str(tmp_path / "r1"), str(tmp_path / "r2")]
+    _add_pdf(roots[0], "A/B/x.pdf", "one")
+    _add_pdf(roots[1], "A/B/x.pdf", "one")
+    _add_pdf(roots[1], "C/y.pdf", "one")
+    _add_pdf(roots[1], "C/z.pdf", "two")
+
+    collected = collect_from_pdfs.collect_notes_from_roots(roots, file_empty=None)
+    assert list(collected["A"]["B"]) == ["f_x.pdf"]
+    assert list(collected["C"]) == ["f_z.pdf"]
+
+
+def test_same_content_within_root_is_kept(tmp_path, stub_extraction):
+    root = str(tmp_path / "r1")
+    _add_pdf(root, "A/x.pdf", "one")
+    _add_pdf(root, "B/y.pdf", "one")
+
+    collected = collect_from_pdfs.collect_notes_from_roots([root], file_empty=None)
+    assert list(collected["A"]) == ["f_x.pdf"]
+    assert list(collected["B"]) == ["f_y.pdf"]
+
+
+def test_only_files_with_shared_sizes_are_hashed(tmp_path, stub_extraction, monkeypatch):
+    hashed = []
+
+    def hash_stub(ff_file: str):
+        hashed.append(ff_file)
+        return ff_file.rsplit("/", 1)[-1]
+
+    monkeypatch.setattr(collect_from_pdfs, "_file_hash", hash_stub)
+    roots = [str(tmp_path / "r1"), str(tmp_path / "r2")]
+    _add_pdf(roots[0], "A/x.pdf", "one")
+    _add_pdf(roots[0], "A/y.pdf", "three")
+    _add_pdf(roots[1], "A/x.pdf", "one")
+    _add_pdf(roots[1], "B/z.pdf", "seventeen")
+
+    collected = collect_from_pdfs.collect_notes_from_roots(roots, file_empty=None)
+    assert sorted(hashed) == sorted(join(root, "literature", "A", "x.pdf") for root in roots)
+    assert list(collected["A"]) == ["f_x.pdf", "f_y.pdf"]
+    assert list(collected["B"]) == ["f_z.pdf"]
+
+
+def test_iter_pdfs_alias_symlink_does_not_hide_directory(tmp_path):
+    _add_pdf(tmp_path, "B/b.pdf", "")
+    _add_pdf(tmp_path, "B/sub/c.pdf", "")
+    symlink(tmp_path / "literature" / "B", tmp_path / "literature" / "A_alias")
+
+    lit = str(tmp_path / "literature")
+    assert list(collect_from_pdfs.iter_pdfs(lit)) == [
+        join(lit, "B", "b.pdf"),
+        join(lit, "B", "sub", "c.pdf"),
+    ]
+
+
+def test_iter_pdfs_symlink_loop_outside_root(tmp_path):
+    _add_pdf(tmp_path, "A/a.pdf", "")
+    outside = tmp_path / "outside"
+    makedirs(outside)
+    (outside / "o.pdf").write_text("")
+    symlink(outside, outside / "loop")
+    symlink(outside, tmp_path / "literature" / "A" / "link")
+
+    lit = str(tmp_path / "literature")
+    assert list(collect_from_pdfs.iter_pdfs(lit)) == [
+        join(lit, "A", "a.pdf"),
+        join(lit, "A", "link", "o.pdf"),
+    ]
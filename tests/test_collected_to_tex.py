@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("pylatex")
+import collected_to_tex
+
+_paper = {"author": "author", "date": (1, 2020), "doi": "missing", "notes": {"general": [("1", "note")]}}
+
+
+def _shard_paths(collection: dict, shard_depth: int):
+    return [path for path, _ in collected_to_tex._find_shards(collection, shard_depth)]
+
+
+def test_papers_above_shard_depth_get_own_shard():
+    collection = {
+        "f_root.pdf": _paper,
+        "A": {"f_a.pdf": _paper, "B": {"C": {"f_c.pdf": _paper}}},
+    }
+    shards = collected_to_tex._find_shards(collection, 2)
+    assert [path for path, _ in shards] == [(), ("A",), ("A", "B")]
+    assert list(shards[0][1]) == ["f_root.pdf"]
+    assert list(shards[1][1]) == ["f_a.pdf"]
+    assert shards[2][1] == {"C": {"f_c.pdf": _paper}}
+
+
+def test_leaves_above_shard_depth_become_shards():
+    collection = {"A": {"f_a.pdf": _paper}, "B": {"C": {"D": {"f_d.pdf": _paper}}}}
+    assert _shard_paths(collection, 3) == [("A",), ("B", "C", "D")]
+
+
+def test_directories_without_papers_get_no_shard():
+    collection = {"A": {"f_a.pdf": {}}, "B": {"C": {}}}
+    assert _shard_paths(collection, 1) == []
+    assert _shard_paths({}, 1) == []
+
+
+def test_sanitised_shard_filenames_are_unique():
+    shard_paths = [("A", "B"), ("A-B",), ("a b",), ("a_b",), ("index",), ()]
+    filenames = collected_to_tex._shard_filenames(shard_paths, {"index"})
+    assert filenames == ["A.B", "A-B", "a_b", "a_b_2", "index_2", "literature"]
@@ -0,0 +1,125 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from os import makedirs
+from os.path import join
+from threading import Thread
+
+import pytest
+
+pytest.importorskip("fitz")
+pytest.importorskip("pylatex")
+import collect_from_pdfs
+import collected_to_tex
+import pdfs_to_tex
+
+
+def _read_stub(pdf_path: str):
+    with open(pdf_path, "r") as f:
+        note = f.read()
+    if note == "fail":
+        raise RuntimeError(f"Could not read '{pdf_path}'.")
+    metadata = {"author": "author", "creationDate": "D:20200101000000", "subject": ""}
+    return metadata, {"general": [("1", note)]} if note != "" else {}
+
+
+def _render_stub(tex_document, paper_data: dict):
+    for _, note in paper_data["notes"].get("general", []):
+        tex_document.append(note)
+
+
+@pytest.fixture
+def stub_pipeline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for module in [collect_from_pdfs, pdfs_to_tex]:
+        monkeypatch.setattr(module, "pdf_read", _read_stub)
+    monkeypatch.setattr(pdfs_to_tex, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(collected_to_tex, "paper_notes_to_tex_paragraph", _render_stub)
+
+
+def _add_pdf(relative_path: str, content: str):
+    ff_pdf = join("literature", relative_path)
+    makedirs(ff_pdf.rsplit("/", 1)[0], exist_ok=True)
+    with open(ff_pdf, "w") as f:
+        f.write(content)
+
+
+def _headings(ff_tex: str):
+    with open(ff_tex, "r") as f:
+        return re.findall(r"\\((?:sub)*section|paragraph)\{(.*?)\}", f.read())
+
+
+def _run_pipelined(**kwargs):
+    # runs the pipeline in a thread so that a blocked pipeline fails the test instead of hanging it
+    result = {}
+
+    def run():
+        try:
+            result["collected"] = pdfs_to_tex.pdfs_to_tex_pipelined(**kwargs)
+        except Exception as error:
+            result["error"] = error
+
+    runner = Thread(target=run, daemon=True)
+    runner.start()
+    runner.join(timeout=30)
+    assert not runner.is_alive(), "the pipeline did not finish"
+    return result
+
+
+def test_same_output_as_sequential(stub_pipeline):
+    for relative_path in ["B/b 2.pdf", "B/C/c.pdf", "B/C/D/d.pdf", "A/a.pdf", "B/a.pdf"]:
+        _add_pdf(relative_path, relative_path)
+
+    # sorting out the empty papers does not support directories with papers and subdirectories
+    sequential = collect_from_pdfs.collect_notes(file_json="sequential.json", file_empty=None)
+    collected_to_tex.collected_notes_to_tex(sequential, save_as="sequential")
+    result = _run_pipelined(
+        file_json="pipelined.json", file_empty=None, save_as="pipelined", queue_size=1
+    )
+
+    assert result["collected"] == sequential
+    with open("sequential.json", "r") as f_sequential, open("pipelined.json", "r") as f_pipelined:
+        assert json.load(f_pipelined) == json.load(f_sequential)
+    assert _headings("pipelined.tex") == _headings("sequential.tex")
+    assert [title for kind, title in _headings("pipelined.tex") if kind == "paragraph"] == [
+        "a",
+        "a",
+        "b 2",
+        "c",
+        "d",
+    ]
+
+
+def test_skips_papers_without_notes(stub_pipeline):
+    _add_pdf("A/empty.pdf", "")
+    _add_pdf("A/full.pdf", "note")
+
+    result = _run_pipelined(file_empty="empty.json")
+    assert list(result["collected"]["A"]) == ["f_full.pdf"]
+    assert ("paragraph", "empty") not in _headings("collected.tex")
+    with open("empty.json", "r") as f_empty:
+        assert json.load(f_empty) == {"A": ["empty.pdf"]}
+
+    assert "error" not in _run_pipelined(file_empty=None)
+    assert ("paragraph", "empty") in _headings("collected.tex")
+
+
+def test_extraction_error_is_raised(stub_pipeline):
+    for i in range(20):
+        _add_pdf(f"A/{i:02d}.pdf", "note")
+    _add_pdf("A/05.pdf", "fail")
+
+    result = _run_pipelined(queue_size=1)
+    assert isinstance(result["error"], RuntimeError)
+
+
+def test_rendering_error_is_raised(stub_pipeline, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("Could not render.")
+
+    monkeypatch.setattr(pdfs_to_tex, "paper_to_tex", fail)
+    for i in range(20):
+        _add_pdf(f"A/{i:02d}.pdf", "note")
+
+    result = _run_pipelined(queue_size=1)
+    assert isinstance(result["error"], RuntimeError)